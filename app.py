@@ -1,12 +1,26 @@
-from fastapi import FastAPI, Request, BackgroundTasks
-from pydantic import BaseModel
+from fastapi import FastAPI, Request
+from fastapi.responses import ORJSONResponse
+import msgspec
 import os
-import requests
-from github import Github, GithubException
+import asyncio
+import httpx
+import orjson
 import base64
+import hmac
+import logging
+import re
+import random
 import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from functools import lru_cache
 
-class TaskRequest(BaseModel):
+logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+log = logging.getLogger("app")
+# httpx logs every request at INFO; keep only its warnings.
+logging.getLogger("httpx").setLevel(logging.WARNING)
+
+class TaskRequest(msgspec.Struct):
     email: str
     secret: str
     task: str
@@ -17,14 +31,126 @@ class TaskRequest(BaseModel):
     evaluation_url: str
     attachments: list
 
-app = FastAPI()
-
 MY_SECRET = os.environ.get("PROJECT_SECRET")
+MY_SECRET_BYTES = MY_SECRET.encode("utf-8") if MY_SECRET is not None else None
 GITHUB_TOKEN = os.environ.get("GITHUB_TOKEN")
 AI_PIPE_TOKEN = os.environ.get("AI_PIPE_TOKEN")
 AI_PIPE_URL = "https://aipipe.org/openai/v1/chat/completions"
+GITHUB_API_URL = "https://api.github.com"
+
+# Populated once at startup; the authenticated account never changes while the process runs.
+USER_LOGIN = None
+
+GITHUB_MAX_RETRIES = 3
+
+class GHRateLimiter:
+    # Primary limits are tracked per X-RateLimit-Resource bucket (core, graphql, ...);
+    # a secondary-limit Retry-After pauses every bucket until retry_at.
+    def __init__(self, min_remaining: int = 5):
+        self.remaining = {}
+        self.reset_at = {}
+        self.retry_at = 0.0
+        self.min_remaining = min_remaining
+        self.locks = {}
+
+    def update(self, response: httpx.Response):
+        resource = response.headers.get("X-RateLimit-Resource", "core")
+        remaining = response.headers.get("X-RateLimit-Remaining")
+        reset = response.headers.get("X-RateLimit-Reset")
+        retry_after = parse_retry_after(response.headers.get("Retry-After"))
+        if remaining is not None:
+            self.remaining[resource] = int(remaining)
+        if reset is not None:
+            self.reset_at[resource] = float(reset)
+        if retry_after is not None:
+            self.retry_at = max(self.retry_at, time.time() + retry_after)
+
+    def exhausted(self, resource: str):
+        return self.remaining.get(resource, self.min_remaining) == 0
+
+    async def acquire(self, resource: str = "core"):
+        # Holding the lock while sleeping makes every other caller of the bucket wait for the same reset.
+        async with self.locks.setdefault(resource, asyncio.Lock()):
+            delay = self.retry_at - time.time()
+            if delay > 0:
+                log.warning("GitHub asked us to back off. Sleeping %.1fs.", delay)
+                await asyncio.sleep(delay)
+            remaining = self.remaining.get(resource, self.min_remaining)
+            if remaining < self.min_remaining:
+                delay = self.reset_at.get(resource, 0.0) - time.time()
+                if delay > 0:
+                    log.warning("GitHub %s rate limit nearly exhausted (%d left). Sleeping %.1fs.", resource, remaining, delay)
+                    await asyncio.sleep(delay)
+
+github_rate_limiter = GHRateLimiter()
+
+async def track_github_rate_limit(response: httpx.Response):
+    github_rate_limiter.update(response)
+
+# One long-lived client per upstream so TLS setup is paid once and HTTP/2 multiplexes concurrent calls.
+GH_CLIENT = httpx.AsyncClient(
+    base_url=GITHUB_API_URL,
+    http2=True,
+    headers={
+        "Authorization": f"token {GITHUB_TOKEN}",
+        "Accept": "application/vnd.github+json",
+        "Content-Type": "application/json"
+    },
+    timeout=httpx.Timeout(10, connect=5),
+    limits=httpx.Limits(max_connections=64, max_keepalive_connections=32, keepalive_expiry=300),
+    event_hooks={"response": [track_github_rate_limit]}
+)
+AIPIPE_CLIENT = httpx.AsyncClient(
+    http2=True,
+    headers={"Content-Type": "application/json", "Authorization": f"Bearer {AI_PIPE_TOKEN}"},
+    timeout=httpx.Timeout(120, connect=5),
+    limits=httpx.Limits(max_keepalive_connections=32, keepalive_expiry=300)
+)
+GRADER_CLIENT = httpx.AsyncClient(
+    http2=True,
+    headers={"Content-Type": "application/json"},
+    timeout=httpx.Timeout(10, connect=5),
+    limits=httpx.Limits(max_keepalive_connections=32)
+)
+
+# Caps concurrent GitHub calls across all jobs to stay under the secondary rate limit.
+github_semaphore = asyncio.Semaphore(8)
+
+WORKER_CONCURRENCY = int(os.environ.get("WORKER_CONCURRENCY", 16))
+TASK_QUEUE_SIZE = int(os.environ.get("TASK_QUEUE_SIZE", 256))
 
-github_client = Github(GITHUB_TOKEN)
+# Bounded so a burst of requests is rejected with 503 instead of piling up in memory.
+task_queue = asyncio.Queue(maxsize=TASK_QUEUE_SIZE)
+
+class NonceCache:
+    def __init__(self, maxsize: int = 10_000, ttl: float = 3600):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.entries = OrderedDict()
+
+    def get(self, nonce: str):
+        entry = self.entries.get(nonce)
+        if entry is None:
+            return None
+        expires_at, payload = entry
+        if expires_at < time.monotonic():
+            del self.entries[nonce]
+            return None
+        self.entries.move_to_end(nonce)
+        return payload
+
+    def set(self, nonce: str, payload: dict):
+        self.entries[nonce] = (time.monotonic() + self.ttl, payload)
+        self.entries.move_to_end(nonce)
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+# Successful notification payloads by nonce, so grader retries of a finished task skip the LLM and GitHub.
+nonce_cache = NonceCache()
+# Nonces whose job is still running, so a duplicate delivery waits for it instead of deploying again.
+inflight_nonces = {}
+# Strong references to duplicate-delivery waiters so they aren't garbage collected while waiting.
+duplicate_waiters = set()
 
 MIT_LICENSE_TEXT = """
 MIT License
@@ -50,163 +176,368 @@ OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 """
 
-def decode_attachment(attachment):
+SYSTEM_PROMPT = "You are an expert web developer who returns only raw HTML code for 'index.html'."
+
+PROMPT_TEMPLATE = """
+        You are an expert web developer. Your task is to generate a single, self-contained HTML file named 'index.html' based on the following brief.
+        The final output must be ONLY the raw HTML code, with no explanations, comments, or markdown.
+        **Brief:** {brief}
+        **Attachments:** Your code should fetch files like {attachment_info} from the same directory (e.g., './data.csv').
+        """.format
+
+README_TEMPLATE = """
+        # Project: {repo_name}
+
+        ## Summary
+        This project was auto-generated for the TDS Project 1 in response to the brief:
+        "{brief}"
+
+        ## Usage
+        This is a static site. The deployed version is available via GitHub Pages.
+
+        ## Code Explanation
+        The `index.html` file is a self-contained application generated by an LLM.
+        Any attachments, like `data.csv`, are fetched by the HTML file.
+
+        ## License
+        This project is licensed under the MIT License.
+        """.format
+
+BASE64_RE = re.compile(r"[A-Za-z0-9+/]*={0,2}")
+CODE_FENCE_RE = re.compile(r"^```[\w-]*[ \t]*\r?\n?|\r?\n?```$")
+
+@lru_cache(maxsize=1024)
+def build_prompt(brief: str, attachment_names: tuple):
+    attachment_info = "\n".join(f"File: {name}" for name in attachment_names)
+    return PROMPT_TEMPLATE(brief=brief, attachment_info=attachment_info)
+
+def encode_text(text: str) -> str:
+    return base64.b64encode(text.encode("utf-8")).decode("ascii")
+
+# files_to_commit values are base64 strings, which is what createCommitOnBranch expects.
+LICENSE_B64 = encode_text(MIT_LICENSE_TEXT)
+
+def read_attachment(attachment):
+    # Attachments already arrive base64-encoded, so the data URL payload is passed through as-is.
     try:
         header, encoded = attachment['url'].split(',', 1)
-        return base64.b64decode(encoded).decode('utf-8')
+        if not header.endswith(";base64"):
+            raise ValueError("attachment is not a base64 data URL")
+        # A malformed payload would fail the whole createCommitOnBranch mutation, so reject it here.
+        if len(encoded) % 4 or not BASE64_RE.fullmatch(encoded):
+            raise ValueError("attachment payload is not valid base64")
+        return attachment['name'], encoded
     except Exception as e:
-        print(f"Error decoding attachment {attachment['name']}: {e}")
-        return None
+        log.error("Error reading attachment %s: %s", attachment['name'], e)
+        return attachment['name'], None
 
-def create_or_update_repo(repo_name: str, files_to_commit: dict, commit_message: str):
-    try:
-        user = github_client.get_user()
-        try:
-            repo = user.get_repo(repo_name)
-            print(f"Repo '{repo_name}' already exists. Updating files.")
-        except GithubException:
-            print(f"Creating new public repo: '{repo_name}'")
-            repo = user.create_repo(repo_name, private=False, auto_init=True)
-            time.sleep(2)
-
-        for file_path, content in files_to_commit.items():
-            try:
-                file = repo.get_contents(file_path, ref="main")
-                repo.update_file(file_path, commit_message, content, file.sha, branch="main")
-                print(f"Updated file: {file_path}")
-            except GithubException:
-                repo.create_file(file_path, commit_message, content, branch="main")
-                print(f"Created new file: {file_path}")
-
-        pages_url = f"https://{user.login}.github.io/{repo_name}/"
-        pages_endpoint = f"https://api.github.com/repos/{user.login}/{repo_name}/pages"
-        headers = {"Authorization": f"token {GITHUB_TOKEN}", "Accept": "application/vnd.github.v3+json"}
-        data = {"source": {"branch": "main", "path": "/"}}
-        response = requests.post(pages_endpoint, json=data, headers=headers)
-
-        if response.status_code == 201:
-            print(f"GitHub Pages enabled at: {pages_url}")
+HEAD_OID_QUERY = """
+query($owner: String!, $name: String!) {
+  repository(owner: $owner, name: $name) {
+    ref(qualifiedName: "refs/heads/main") { target { oid } }
+  }
+}
+"""
+
+CREATE_COMMIT_MUTATION = """
+mutation($input: CreateCommitOnBranchInput!) {
+  createCommitOnBranch(input: $input) { commit { oid url } }
+}
+"""
+
+async def github_request(method: str, url: str, json=None, **kwargs):
+    if json is not None:
+        kwargs["content"] = orjson.dumps(json)
+    resource = "graphql" if url == "/graphql" else "core"
+    for attempt in range(GITHUB_MAX_RETRIES):
+        await github_rate_limiter.acquire(resource)
+        async with github_semaphore:
+            response = await GH_CLIENT.request(method, url, **kwargs)
+        if response.status_code not in (403, 429):
+            return response
+        retry_after = response.headers.get("Retry-After")
+        if retry_after is not None:
+            # The limiter recorded retry_at from this response; the next acquire() waits it out.
+            log.warning("GitHub rate limited (status %d). Retrying after %ss...", response.status_code, retry_after)
+        elif github_rate_limiter.exhausted(response.headers.get("X-RateLimit-Resource", resource)):
+            log.warning("GitHub rate limit exhausted (status %d). Waiting for reset...", response.status_code)
         else:
-            print(f"GitHub Pages already enabled or error (status {response.status_code}): {response.json().get('message', '')}")
+            return response
+    return response
+
+async def github_graphql(query: str, variables: dict):
+    response = await github_request("POST", "/graphql", json={"query": query, "variables": variables})
+    response.raise_for_status()
+    body = orjson.loads(response.content)
+    if body.get("errors"):
+        raise Exception(f"GitHub GraphQL error: {body['errors'][0].get('message', body['errors'])}")
+    return body["data"]
 
-        commit_sha = repo.get_branch("main").commit.sha
-        return repo.html_url, pages_url, commit_sha
+async def commit_files(owner: str, repo_name: str, files_to_commit: dict, commit_message: str):
+    # Every file lands in a single commit, so the round-trips no longer grow with the file count.
+    data = await github_graphql(HEAD_OID_QUERY, {"owner": owner, "name": repo_name})
+    repository = data["repository"]
+    if repository is None:
+        raise Exception(f"GitHub repo {owner}/{repo_name} not found")
+    if repository["ref"] is None:
+        raise Exception(f"Branch main not found in {owner}/{repo_name}")
+    head_oid = repository["ref"]["target"]["oid"]
+    additions = [
+        {"path": file_path, "contents": content}
+        for file_path, content in files_to_commit.items()
+    ]
+    # CommitMessage takes a one-line headline; multi-line briefs go in the body.
+    headline, _, body = commit_message.partition("\n")
+    message = {"headline": headline.strip()}
+    if body.strip():
+        message["body"] = body.strip()
+    commit_input = {
+        "branch": {"repositoryNameWithOwner": f"{owner}/{repo_name}", "branchName": "main"},
+        "message": message,
+        "fileChanges": {"additions": additions},
+        "expectedHeadOid": head_oid
+    }
+    data = await github_graphql(CREATE_COMMIT_MUTATION, {"input": commit_input})
+    commit = data["createCommitOnBranch"]["commit"]
+    log.info("Committed %d files: %s", len(additions), commit['url'])
+    return commit["oid"]
+
+def github_error_message(response: httpx.Response):
+    # Error bodies are usually JSON, but proxies and 5xx pages can return HTML.
+    try:
+        body = orjson.loads(response.content)
+    except orjson.JSONDecodeError:
+        return response.text[:200]
+    return body.get("message", "") if isinstance(body, dict) else ""
+
+async def enable_pages(owner: str, repo_name: str):
+    pages_endpoint = f"/repos/{owner}/{repo_name}/pages"
+    data = {"source": {"branch": "main", "path": "/"}}
+    response = await github_request("POST", pages_endpoint, json=data)
+
+    if response.status_code == 201:
+        log.info("GitHub Pages enabled for %s/%s", owner, repo_name)
+    elif log.isEnabledFor(logging.INFO):
+        log.info("GitHub Pages already enabled or error (status %d): %s", response.status_code, github_error_message(response))
+
+async def wait_for_repo_ready(owner: str, repo_name: str, attempts: int = 10, interval: float = 0.2):
+    readme_endpoint = f"/repos/{owner}/{repo_name}/contents/README.md"
+    for _ in range(attempts):
+        response = await github_request("GET", readme_endpoint)
+        if response.status_code == 200:
+            return True
+        await asyncio.sleep(interval)
+    log.warning("Repo '%s/%s' not ready after %d checks. Continuing anyway.", owner, repo_name, attempts)
+    return False
+
+async def ensure_repo(owner: str, repo_name: str):
+    # Optimistically create; an existing repo comes back as 422, so new repos skip the lookup.
+    data = {"name": repo_name, "private": False, "auto_init": True}
+    response = await github_request("POST", "/user/repos", json=data)
+    if response.status_code == 201:
+        log.info("Created new public repo: '%s'", repo_name)
+        await wait_for_repo_ready(owner, repo_name)
+    elif response.status_code == 422 and "already exists" in response.text:
+        log.info("Repo '%s' already exists. Updating files.", repo_name)
+    else:
+        raise Exception(f"GitHub repo creation error: {response.status_code} - {response.text}")
+
+async def push_to_repo(repo_name: str, files_to_commit: dict, commit_message: str):
+    try:
+        # main already exists (auto_init), so Pages can be enabled while the commit is in flight.
+        commit_sha, pages_result = await asyncio.gather(
+            commit_files(USER_LOGIN, repo_name, files_to_commit, commit_message),
+            enable_pages(USER_LOGIN, repo_name),
+            return_exceptions=True
+        )
+        if isinstance(commit_sha, BaseException):
+            raise commit_sha
+        if isinstance(pages_result, BaseException):
+            log.error("Error enabling GitHub Pages: %s", pages_result)
+
+        repo_url = f"https://github.com/{USER_LOGIN}/{repo_name}"
+        pages_url = f"https://{USER_LOGIN}.github.io/{repo_name}/"
+        return repo_url, pages_url, commit_sha
     except Exception as e:
-        print(f"Error in GitHub operation: {e}")
+        log.error("Error in GitHub operation: %s", e)
         return None, None, None
 
-def notify_grader(url: str, payload: dict, error_message: str = None):
+def parse_retry_after(value: str):
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return None
+
+async def notify_grader(url: str, payload: dict, error_message: str = None, max_seconds: float = 120):
     if error_message:
         payload["error"] = error_message
-    headers = {"Content-Type": "application/json"}
-    delay = 1
-    for attempt in range(4):
+    deadline = time.monotonic() + max_seconds
+    attempt = 0
+    while True:
+        retry_after = None
         try:
-            response = requests.post(url, json=payload, headers=headers, timeout=10)
-            if response.status_code == 200:
-                print(f"Successfully notified grader at {url}")
+            response = await GRADER_CLIENT.post(url, content=orjson.dumps(payload))
+            if response.is_success:
+                log.info("Successfully notified grader at %s", url)
                 return
-            else:
-                print(f"Grader notification failed (Attempt {attempt + 1}). Status: {response.status_code}. Retrying...")
-        except requests.exceptions.RequestException as e:
-            print(f"Grader notification failed (Attempt {attempt + 1}). Error: {e}. Retrying...")
-        time.sleep(delay)
-        delay *= 2
-    print(f"Failed to notify grader at {url} after all attempts.")
+            if response.status_code != 429 and response.status_code < 500:
+                log.error("Grader notification failed (Attempt %d). Status: %d. Not retrying.", attempt + 1, response.status_code)
+                return
+            retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            log.warning("Grader notification failed (Attempt %d). Status: %d. Retrying...", attempt + 1, response.status_code)
+        except httpx.TransportError as e:
+            log.warning("Grader notification failed (Attempt %d). Error: %s. Retrying...", attempt + 1, e)
+        # Truncated exponential backoff with full jitter, unless the grader told us how long to wait.
+        # Retry-After is floored at 1s so a "0" doesn't turn the loop into a busy retry.
+        delay = max(retry_after, 1) if retry_after is not None else random.uniform(1, min(60, 2 ** attempt))
+        if time.monotonic() + delay > deadline:
+            break
+        await asyncio.sleep(delay)
+        attempt += 1
+    log.error("Failed to notify grader at %s after %d attempts.", url, attempt + 1)
+
+async def task_worker():
+    while True:
+        request = await task_queue.get()
+        try:
+            await process_task_in_background(request)
+        except Exception as e:
+            log.exception("Unhandled error in background job for task %s: %s", request.task, e)
+        finally:
+            task_queue.task_done()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global USER_LOGIN
+    response = await github_request("GET", "/user")
+    response.raise_for_status()
+    USER_LOGIN = orjson.loads(response.content)["login"]
+    log.info("Authenticated to GitHub as %s", USER_LOGIN)
+    workers = [asyncio.create_task(task_worker()) for _ in range(WORKER_CONCURRENCY)]
+    log.info("Started %d task workers (queue size %d)", WORKER_CONCURRENCY, TASK_QUEUE_SIZE)
+    yield
+    for worker in workers:
+        worker.cancel()
+    await asyncio.gather(*workers, return_exceptions=True)
+    await asyncio.gather(GH_CLIENT.aclose(), AIPIPE_CLIENT.aclose(), GRADER_CLIENT.aclose())
+
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
 
 @app.post("/")
-async def handle_task_request(request: TaskRequest, background_tasks: BackgroundTasks):
-    if request.secret != MY_SECRET:
-        print("Error: Invalid secret received.")
+async def handle_task_request(http_request: Request):
+    try:
+        request = msgspec.json.decode(await http_request.body(), type=TaskRequest, strict=False)
+    except msgspec.DecodeError as e:
+        log.error("Invalid request body: %s", e)
+        return ORJSONResponse(status_code=422, content={"status": "error", "message": f"Invalid request: {e}"})
+    if MY_SECRET_BYTES is None or not hmac.compare_digest(request.secret.encode("utf-8"), MY_SECRET_BYTES):
+        log.error("Invalid secret received.")
         return {"status": "error", "message": "Invalid secret"}
-    print(f"Received valid request for task: {request.task} (Round: {request.round})")
-    background_tasks.add_task(process_task_in_background, request)
+    log.info("Received valid request for task: %s (Round: %d)", request.task, request.round)
+    try:
+        task_queue.put_nowait(request)
+    except asyncio.QueueFull:
+        log.error("Task queue full, rejecting task: %s", request.task)
+        return ORJSONResponse(status_code=503, content={"status": "error", "message": "Server busy, retry later"})
     return {"status": "Request received. Processing in background."}
 
-def process_task_in_background(request: TaskRequest):
-    print(f"--- Starting background job for task: {request.task} ---")
+async def generate_code(request: TaskRequest):
+    log.info("Generating code with AI Pipe...")
+    prompt_content = build_prompt(request.brief, tuple(a['name'] for a in request.attachments))
+    data = {
+        "model": "gpt-3.5-turbo",
+        "messages": [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": prompt_content}
+        ]
+    }
+    response = await AIPIPE_CLIENT.post(AI_PIPE_URL, content=orjson.dumps(data))
+    if response.status_code != 200:
+        raise Exception(f"AI Pipe API Error: {response.status_code} - {response.text}")
+    generated_code = orjson.loads(response.content)['choices'][0]['message']['content'].strip()
+    generated_code = CODE_FENCE_RE.sub("", generated_code)
+    log.info("Successfully generated code from AI Pipe.")
+    return generated_code
+
+async def resend_when_done(request: TaskRequest, running: asyncio.Event):
+    await running.wait()
+    cached_payload = nonce_cache.get(request.nonce)
+    if cached_payload is None:
+        log.info("Earlier job for task %s with nonce %s failed and already notified the grader. Dropping duplicate.", request.task, request.nonce)
+        return
+    log.info("Task %s with nonce %s deployed by the earlier job. Re-sending notification.", request.task, request.nonce)
+    await notify_grader(request.evaluation_url, dict(cached_payload))
+
+async def process_task_in_background(request: TaskRequest):
+    running = inflight_nonces.get(request.nonce)
+    if running is not None:
+        # Wait off the worker pool so duplicates don't hold worker slots during the original run.
+        log.info("Task %s with nonce %s is already in progress. Will re-send its result.", request.task, request.nonce)
+        waiter = asyncio.create_task(resend_when_done(request, running))
+        duplicate_waiters.add(waiter)
+        waiter.add_done_callback(duplicate_waiters.discard)
+        return
+    cached_payload = nonce_cache.get(request.nonce)
+    if cached_payload is not None:
+        log.info("Task %s with nonce %s already deployed. Re-sending notification.", request.task, request.nonce)
+        await notify_grader(request.evaluation_url, dict(cached_payload))
+        return
+    done = asyncio.Event()
+    inflight_nonces[request.nonce] = done
+    try:
+        await run_task(request)
+    finally:
+        del inflight_nonces[request.nonce]
+        done.set()
+
+async def run_task(request: TaskRequest):
+    log.info("--- Starting background job for task: %s ---", request.task)
     notification_payload = {
         "email": request.email,
         "task": request.task,
         "round": request.round,
         "nonce": request.nonce
     }
-    generated_code = None
-    try:
-        print("Generating code with AI Pipe...")
-        attachment_info = "\n".join([f"File: {a['name']}" for a in request.attachments])
-        prompt_content = f"""
-        You are an expert web developer. Your task is to generate a single, self-contained HTML file named 'index.html' based on the following brief.
-        The final output must be ONLY the raw HTML code, with no explanations, comments, or markdown.
-        **Brief:** {request.brief}
-        **Attachments:** Your code should fetch files like {attachment_info} from the same directory (e.g., './data.csv').
-        """
-        headers = {
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {AI_PIPE_TOKEN}"
-        }
-        data = {
-            "model": "gpt-3.5-turbo",
-            "messages": [
-                {"role": "system", "content": "You are an expert web developer who returns only raw HTML code for 'index.html'."},
-                {"role": "user", "content": prompt_content}
-            ]
-        }
-        response = requests.post(AI_PIPE_URL, headers=headers, json=data)
-        if response.status_code != 200:
-            raise Exception(f"AI Pipe API Error: {response.status_code} - {response.text}")
-        generated_code = response.json()['choices'][0]['message']['content'].strip()
-        if generated_code.startswith("```html"):
-            generated_code = generated_code[7:]
-        if generated_code.endswith("```"):
-            generated_code = generated_code[:-3]
-        print("Successfully generated code from AI Pipe.")
-    except Exception as e:
-        print(f"An error occurred during LLM code generation: {e}")
-        notify_grader(request.evaluation_url, notification_payload, error_message=f"LLM generation failed: {e}")
+    repo_name = request.task
+    # The repo doesn't depend on the generated code, so it is created while the LLM is still working.
+    generated_code, repo_error = await asyncio.gather(
+        generate_code(request),
+        ensure_repo(USER_LOGIN, repo_name),
+        return_exceptions=True
+    )
+    if isinstance(repo_error, BaseException):
+        log.error("An error occurred preparing GitHub repo %s: %s", repo_name, repo_error)
+    if isinstance(generated_code, BaseException):
+        log.error("An error occurred during LLM code generation: %s", generated_code)
+        await notify_grader(request.evaluation_url, notification_payload, error_message=f"LLM generation failed: {generated_code}")
         return
     try:
-        repo_name = request.task
+        if isinstance(repo_error, BaseException):
+            raise repo_error
         commit_message = f"Round {request.round}: {request.brief}"
-        readme_content = f"""
-        # Project: {repo_name}
-
-        ## Summary
-        This project was auto-generated for the TDS Project 1 in response to the brief:
-        "{request.brief}"
-
-        ## Usage
-        This is a static site. The deployed version is available via GitHub Pages.
-
-        ## Code Explanation
-        The `index.html` file is a self-contained application generated by an LLM.
-        Any attachments, like `data.csv`, are fetched by the HTML file.
-
-        ## License
-        This project is licensed under the MIT License.
-        """
         files_to_commit = {
-            "index.html": generated_code,
-            "README.md": readme_content,
-            "LICENSE": MIT_LICENSE_TEXT
+            "index.html": encode_text(generated_code),
+            "README.md": encode_text(README_TEMPLATE(repo_name=repo_name, brief=request.brief)),
+            "LICENSE": LICENSE_B64
         }
         for attachment in request.attachments:
-            content = decode_attachment(attachment)
-            if content:
-                files_to_commit[attachment['name']] = content
-                print(f"Added attachment: {attachment['name']}")
-        print(f"Pushing files to GitHub repo: {repo_name}")
-        repo_url, pages_url, commit_sha = create_or_update_repo(repo_name, files_to_commit, commit_message)
+            name, encoded = read_attachment(attachment)
+            if encoded is not None:
+                files_to_commit[name] = encoded
+                log.info("Added attachment: %s", name)
+        log.info("Pushing files to GitHub repo: %s", repo_name)
+        repo_url, pages_url, commit_sha = await push_to_repo(repo_name, files_to_commit, commit_message)
         if not repo_url:
             raise Exception("Failed to create or update GitHub repository.")
-        print(f"Successfully deployed to GitHub. Repo: {repo_url}, Pages: {pages_url}")
+        log.info("Successfully deployed to GitHub. Repo: %s, Pages: %s", repo_url, pages_url)
         notification_payload.update({
             "repo_url": repo_url,
             "commit_sha": commit_sha,
             "pages_url": pages_url
         })
-        notify_grader(request.evaluation_url, notification_payload)
+        nonce_cache.set(request.nonce, dict(notification_payload))
+        await notify_grader(request.evaluation_url, notification_payload)
     except Exception as e:
-        print(f"An error occurred during GitHub deployment: {e}")
-        notify_grader(request.evaluation_url, notification_payload, error_message=f"Deployment failed: {e}")
-    print(f"--- Finished background job for task: {request.task} ---")
+        log.error("An error occurred during GitHub deployment: %s", e)
+        await notify_grader(request.evaluation_url, notification_payload, error_message=f"Deployment failed: {e}")
+    log.info("--- Finished background job for task: %s ---", request.task)